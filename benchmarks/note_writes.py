@@ -0,0 +1,113 @@
+"""Пропускная способность записи заметок в зависимости от числа шардов.
+
+Для каждого числа шардов создаётся временный каталог с базами,
+несколько процессов-писателей параллельно сохраняют заметки (каждая
+в своей транзакции), и считается число записей в секунду.
+
+    python benchmarks/note_writes.py --shards 1 2 4 8 --writers 8
+"""
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from multiprocessing import get_context
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+
+
+def setup_django():
+    sys.path.insert(0, str(BASE_DIR))
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'yanote.settings')
+    import django
+    django.setup()
+
+
+def write_notes(task):
+    """Сохраняет заметки одного автора, возвращает время начала и конца."""
+    from notes.models import Note
+
+    author_id, prefix, count = task
+    start = time.perf_counter()
+    for i in range(count):
+        Note(
+            title='Заметка', text='Текст', slug=f'{prefix}-{author_id}-{i}',
+            author_id=author_id,
+        ).save()
+    return start, time.perf_counter()
+
+
+def pick_authors(writers):
+    """Создаёт авторов так, чтобы писатели поровну делились между шардами."""
+    from django.conf import settings
+    from django.contrib.auth import get_user_model
+    from notes.routers import shard_for_author
+
+    User = get_user_model()
+    per_shard = -(-writers // len(settings.NOTES_SHARDS))
+    taken = {shard: 0 for shard in settings.NOTES_SHARDS}
+    authors = []
+    while len(authors) < writers:
+        user = User.objects.create(username=f'writer-{User.objects.count()}')
+        shard = shard_for_author(user.pk)
+        if taken[shard] < per_shard:
+            taken[shard] += 1
+            authors.append(user.pk)
+    return authors
+
+
+def run(writers, notes):
+    """Замер для числа шардов, заданного в окружении."""
+    setup_django()
+    from django.conf import settings
+    from django.core.management import call_command
+
+    for alias in settings.DATABASES:
+        call_command('migrate', database=alias, verbosity=0)
+    authors = pick_authors(writers)
+    with get_context('spawn').Pool(writers, initializer=setup_django) as pool:
+        # Прогрев: процессы стартуют и открывают соединения до замера.
+        pool.map(write_notes, [(author, 'warmup', 1) for author in authors])
+        spans = pool.map(
+            write_notes, [(author, 'note', notes) for author in authors]
+        )
+    elapsed = max(end for _, end in spans) - min(start for start, _ in spans)
+    print(f'{writers * notes / elapsed:.0f}')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--shards', type=int, nargs='+', default=[1, 2, 4, 8])
+    parser.add_argument('--writers', type=int, default=8)
+    parser.add_argument('--notes', type=int, default=200)
+    parser.add_argument('--run', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.run:
+        run(args.writers, args.notes)
+        return
+
+    print(f'писателей: {args.writers}, заметок на писателя: {args.notes}')
+    print(f'{"шардов":>8} {"записей/с":>10} {"ускорение":>10}')
+    baseline = None
+    for shards in args.shards:
+        with tempfile.TemporaryDirectory() as db_dir:
+            env = dict(
+                os.environ,
+                YANOTE_DB_DIR=db_dir,
+                NOTES_SHARD_COUNT=str(shards),
+            )
+            output = subprocess.run(
+                [sys.executable, __file__, '--run',
+                 '--writers', str(args.writers), '--notes', str(args.notes)],
+                env=env, check=True, capture_output=True, text=True,
+            ).stdout
+        throughput = int(output.split()[-1])
+        baseline = baseline or throughput
+        print(f'{shards:>8} {throughput:>10} {throughput / baseline:>9.2f}x')
+
+
+if __name__ == '__main__':
+    main()
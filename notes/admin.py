@@ -1,5 +1,40 @@
+from django.conf import settings
 from django.contrib import admin
 
 from .models import Note
 
-admin.site.register(Note)
+
+@admin.register(Note)
+class NoteAdmin(admin.ModelAdmin):
+    """Заметки в админке.
+
+    Запросы админки не знают об авторе и идут в базу по умолчанию,
+    поэтому при нескольких шардах заметки в админке недоступны.
+    """
+
+    @staticmethod
+    def _single_shard():
+        return len(settings.NOTES_SHARDS) == 1
+
+    def has_module_permission(self, request):
+        return self._single_shard() and super().has_module_permission(
+            request
+        )
+
+    def has_view_permission(self, request, obj=None):
+        return self._single_shard() and super().has_view_permission(
+            request, obj
+        )
+
+    def has_add_permission(self, request):
+        return self._single_shard() and super().has_add_permission(request)
+
+    def has_change_permission(self, request, obj=None):
+        return self._single_shard() and super().has_change_permission(
+            request, obj
+        )
+
+    def has_delete_permission(self, request, obj=None):
+        return self._single_shard() and super().has_delete_permission(
+            request, obj
+        )
@@ -16,13 +16,17 @@ class NoteForm(forms.ModelForm):
         fields = ('title', 'text', 'slug')
 
     def clean_slug(self):
-        """Обрабатывает случай, если slug не уникален."""
+        """Обрабатывает случай, если slug не уникален в шарде автора."""
         cleaned_data = super().clean()
         slug = cleaned_data.get('slug')
         if not slug:
             title = cleaned_data.get('title')
             slug = slugify(title)[:100]
-        if Note.objects.filter(
+        author_id = self.instance.author_id
+        if author_id is None:
+            # Без автора неизвестен шард, в котором нужно искать slug.
+            return slug
+        if Note.objects.on_author_shard(author_id).filter(
                 slug=slug
         ).exclude(id=self.instance.pk).exists():
             raise ValidationError(slug + WARNING)
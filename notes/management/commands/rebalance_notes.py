@@ -0,0 +1,135 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections, transaction
+
+from notes.models import Note
+from notes.routers import shard_for_author
+
+
+class Command(BaseCommand):
+    help = (
+        'Переносит заметки в шарды, которые им назначены текущими '
+        'настройками NOTES_SHARDS.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Только показать, что будет перенесено.',
+        )
+        parser.add_argument(
+            '--rename-conflicts',
+            action='store_true',
+            help=(
+                'Переносить заметки, чей slug уже занят в целевом шарде, '
+                'добавляя к slug числовой суффикс.'
+            ),
+        )
+
+    def handle(self, *args, **options):
+        self.dry_run = options['dry_run']
+        self.rename_conflicts = options['rename_conflicts']
+        moved = 0
+        conflicts = 0
+        for alias in connections:
+            if not self._has_notes_table(alias):
+                continue
+            author_ids = Note.objects.using(alias).values_list(
+                'author_id', flat=True
+            ).distinct()
+            for author_id in list(author_ids):
+                target = shard_for_author(author_id)
+                if target == alias:
+                    continue
+                author_moved, author_conflicts = self._move_author(
+                    author_id, alias, target
+                )
+                moved += author_moved
+                conflicts += author_conflicts
+        self.stdout.write(f'Перенесено заметок: {moved}')
+        if conflicts:
+            raise CommandError(
+                f'Не перенесено заметок из-за конфликтов slug: {conflicts}. '
+                f'Они недоступны авторам, пока не перенесены; запустите '
+                f'команду с --rename-conflicts.'
+            )
+        self.stdout.write(self.style.SUCCESS('Перебалансировка завершена'))
+
+    @staticmethod
+    def _has_notes_table(alias):
+        connection = connections[alias]
+        with connection.cursor() as cursor:
+            tables = connection.introspection.table_names(cursor)
+        return Note._meta.db_table in tables
+
+    def _move_author(self, author_id, source, target):
+        """Копирует заметки автора в целевой шард и удаляет их в исходном.
+
+        Сначала выполняется копирование, поэтому прерванный перенос
+        оставляет дубликаты, а не теряет данные. Заметка в целевом шарде
+        с тем же автором, slug и содержимым считается уже скопированной.
+        Из исходного шарда удаляются только скопированные заметки;
+        заметки с занятым slug остаются на месте и считаются конфликтами.
+        Возвращает число перенесённых заметок и число конфликтов.
+        """
+        notes = list(Note.objects.using(source).filter(author_id=author_id))
+        existing = {
+            note.slug: note
+            for note in Note.objects.using(target).filter(
+                slug__in=[note.slug for note in notes]
+            )
+        }
+        reserved = {note.slug for note in notes}
+        to_copy = []
+        done_pks = []
+        conflicts = 0
+        for note in notes:
+            present = existing.get(note.slug)
+            if present is None:
+                to_copy.append(note)
+            elif (present.author_id, present.title, present.text) == (
+                    note.author_id, note.title, note.text):
+                done_pks.append(note.pk)
+            elif self.rename_conflicts:
+                old_slug = note.slug
+                note.slug = self._free_slug(target, note.slug, reserved)
+                reserved.add(note.slug)
+                self.stdout.write(
+                    f'Автор {author_id}: slug «{old_slug}» занят в шарде '
+                    f'{target}, новый slug «{note.slug}».'
+                )
+                to_copy.append(note)
+            else:
+                conflicts += 1
+                self.stderr.write(
+                    f'Автор {author_id}: slug «{note.slug}» уже занят в '
+                    f'шарде {target}, заметка осталась в {source}.'
+                )
+        moved = len(to_copy) + len(done_pks)
+        self.stdout.write(
+            f'Автор {author_id}: {moved} заметок {source} -> {target}'
+        )
+        if self.dry_run or not moved:
+            return moved, conflicts
+        done_pks += [note.pk for note in to_copy]
+        for note in to_copy:
+            note.pk = None
+        with transaction.atomic(using=target):
+            Note.objects.using(target).bulk_create(to_copy)
+        with transaction.atomic(using=source):
+            Note.objects.using(source).filter(pk__in=done_pks).delete()
+        return moved, conflicts
+
+    @staticmethod
+    def _free_slug(shard, slug, reserved):
+        """Подбирает slug с суффиксом, свободный в шарде и в переносе."""
+        max_length = Note._meta.get_field('slug').max_length
+        number = 1
+        while True:
+            suffix = f'-{number}'
+            candidate = slug[:max_length - len(suffix)] + suffix
+            if candidate not in reserved and not Note.objects.using(
+                    shard
+            ).filter(slug=candidate).exists():
+                return candidate
+            number += 1
@@ -0,0 +1,21 @@
+# Generated by Django 3.2.25 on 2026-10-19 09:58
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('notes', '0002_alter_note_title'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='note',
+            name='author',
+            field=models.ForeignKey(db_constraint=False, on_delete=django.db.models.deletion.DO_NOTHING, to=settings.AUTH_USER_MODEL),
+        ),
+    ]
@@ -1,8 +1,29 @@
 from django.conf import settings
+from django.core.exceptions import ValidationError
 from django.db import models
 
 from pytils.translit import slugify
 
+from .routers import shard_for_author
+
+
+class NoteQuerySet(models.QuerySet):
+
+    def on_author_shard(self, author_id):
+        """Переключает запрос на шард, где хранятся заметки автора."""
+        return self.using(shard_for_author(author_id))
+
+    def for_author(self, author):
+        """Заметки пользователя из его шарда."""
+        return self.on_author_shard(author.pk).filter(author=author)
+
+    def create(self, **kwargs):
+        # Базовый create() передаёт в save() базу запроса, которая
+        # ничего не знает об авторе; без явного using() решает роутер.
+        note = self.model(**kwargs)
+        note.save(force_insert=True, using=self._db)
+        return note
+
 
 class Note(models.Model):
     title = models.CharField(
@@ -25,12 +46,35 @@ class Note(models.Model):
     )
     author = models.ForeignKey(
         settings.AUTH_USER_MODEL,
-        on_delete=models.CASCADE,
+        # Заметки лежат в шардах, а пользователи - в базе по умолчанию,
+        # поэтому внешний ключ не может быть ограничением на уровне БД,
+        # а каскадное удаление выполняет notes.signals.
+        on_delete=models.DO_NOTHING,
+        db_constraint=False,
     )
 
+    objects = NoteQuerySet.as_manager()
+
     def __str__(self):
         return self.title
 
+    def validate_unique(self, exclude=None):
+        """Проверяет уникальность slug в шарде автора.
+
+        Штатная проверка делает запрос без подсказки роутеру
+        и поэтому попала бы не в тот шард.
+        """
+        exclude = set(exclude or ())
+        super().validate_unique(exclude | {'slug'})
+        if 'slug' in exclude or self.author_id is None:
+            return
+        if Note.objects.on_author_shard(self.author_id).filter(
+                slug=self.slug
+        ).exclude(pk=self.pk).exists():
+            raise ValidationError({
+                'slug': self.unique_error_message(Note, ('slug',))
+            })
+
     def save(self, *args, **kwargs):
         if not self.slug:
             max_slug_length = self._meta.get_field('slug').max_length
@@ -0,0 +1,59 @@
+import hashlib
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS
+
+NOTES_APP_LABEL = 'notes'
+
+
+def shard_for_author(author_id):
+    """Возвращает алиас базы, в которой хранятся заметки автора.
+
+    Хеш стабилен между процессами и перезапусками, поэтому все заметки
+    одного пользователя всегда оказываются в одном и том же шарде.
+    """
+    shards = settings.NOTES_SHARDS
+    digest = hashlib.md5(str(author_id).encode()).digest()
+    return shards[int.from_bytes(digest[:8], 'big') % len(shards)]
+
+
+class NoteShardRouter:
+    """Раскладывает заметки по шардам в зависимости от автора.
+
+    Все остальные модели живут в базе по умолчанию.
+    """
+
+    def _db_for(self, model, instance=None):
+        if model._meta.app_label != NOTES_APP_LABEL:
+            return DEFAULT_DB_ALIAS
+        if instance is None:
+            return None
+        if instance._meta.app_label == NOTES_APP_LABEL:
+            author_id = instance.author_id
+        else:
+            # Обратная связь вида user.note_set: в подсказке лежит автор.
+            author_id = instance.pk
+        if author_id is None:
+            return None
+        return shard_for_author(author_id)
+
+    def db_for_read(self, model, **hints):
+        return self._db_for(model, hints.get('instance'))
+
+    def db_for_write(self, model, **hints):
+        return self._db_for(model, hints.get('instance'))
+
+    def allow_relation(self, obj1, obj2, **hints):
+        labels = {obj1._meta.app_label, obj2._meta.app_label}
+        if NOTES_APP_LABEL in labels:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # Схема заметок есть во всех базах, включая default: так к ним
+        # можно вернуться при уменьшении числа шардов вплоть до одного.
+        if app_label == NOTES_APP_LABEL:
+            return True
+        if db != DEFAULT_DB_ALIAS:
+            return False
+        return None
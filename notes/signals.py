@@ -0,0 +1,23 @@
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, transaction
+from django.db.models.signals import post_delete
+from django.dispatch import receiver
+
+from .models import Note
+
+
+@receiver(post_delete, sender=settings.AUTH_USER_MODEL)
+def delete_author_notes(sender, instance, **kwargs):
+    """Удаляет заметки автора из его шарда.
+
+    Каскадное удаление работает только в пределах одной базы,
+    а заметки могут лежать не там, где пользователи. Заметки удаляются
+    после фиксации удаления пользователя, чтобы откат не уносил их.
+    """
+    author_id = instance.pk
+    transaction.on_commit(
+        lambda: Note.objects.on_author_shard(author_id).filter(
+            author_id=author_id
+        ).delete(),
+        using=DEFAULT_DB_ALIAS,
+    )
@@ -0,0 +1,233 @@
+from http import HTTPStatus
+from io import StringIO
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management import CommandError, call_command
+from django.db import transaction
+from django.test import Client, SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+
+from notes.forms import WARNING
+from notes.models import Note
+from notes.routers import NoteShardRouter, shard_for_author
+
+User = get_user_model()
+
+SHARDS = settings.TEST_NOTES_SHARDS
+
+
+@override_settings(NOTES_SHARDS=SHARDS)
+class TestShardRouter(SimpleTestCase):
+
+    def setUp(self):
+        self.router = NoteShardRouter()
+
+    def test_shard_is_stable(self):
+        """Заметки автора всегда попадают в один и тот же шард."""
+        self.assertEqual(shard_for_author(42), shard_for_author(42))
+        self.assertIn(shard_for_author(42), SHARDS)
+
+    def test_authors_spread_over_all_shards(self):
+        """Авторы распределяются по всем шардам."""
+        used = {shard_for_author(author_id) for author_id in range(100)}
+        self.assertEqual(used, set(SHARDS))
+
+    def test_note_routed_by_author(self):
+        """Заметка и обратная связь user.note_set идут в шард автора."""
+        author = User(pk=7)
+        note = Note(author=author)
+        expected = shard_for_author(7)
+        for hint in (note, author):
+            with self.subTest(hint=hint):
+                self.assertEqual(
+                    self.router.db_for_write(Note, instance=hint), expected
+                )
+                self.assertEqual(
+                    self.router.db_for_read(Note, instance=hint), expected
+                )
+
+    def test_other_models_use_default(self):
+        """Остальные модели, в том числе автор заметки, живут в default."""
+        note = Note(author_id=7)
+        self.assertEqual(self.router.db_for_read(User, instance=note),
+                         'default')
+
+    def test_allow_migrate(self):
+        """Таблица заметок есть во всех базах, остальные - только в default."""
+        self.assertTrue(self.router.allow_migrate('notes_1', 'notes'))
+        self.assertTrue(self.router.allow_migrate('default', 'notes'))
+        self.assertFalse(self.router.allow_migrate('notes_1', 'auth'))
+        self.assertIsNone(self.router.allow_migrate('default', 'auth'))
+
+
+class TestRebalanceNotes(TestCase):
+    databases = {'default', *SHARDS}
+
+    def test_nothing_to_move_with_single_shard(self):
+        """С одним шардом перебалансировка ничего не переносит."""
+        author = User.objects.create(username='Автор')
+        Note.objects.create(
+            title='Заголовок', text='Текст', slug='slug', author=author
+        )
+        out = StringIO()
+        call_command('rebalance_notes', stdout=out)
+        self.assertIn('Перенесено заметок: 0', out.getvalue())
+        self.assertEqual(Note.objects.for_author(author).count(), 1)
+
+
+def create_author(shard, username):
+    """Создаёт пользователя, чьи заметки попадают в заданный шард."""
+    while True:
+        user = User.objects.create(
+            username=f'{username}-{User.objects.count()}'
+        )
+        if shard_for_author(user.pk) == shard:
+            return user
+        user.delete()
+
+
+@override_settings(NOTES_SHARDS=SHARDS)
+class TestShardedNotes(TestCase):
+    databases = {'default', *SHARDS}
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = create_author('notes_1', 'Автор')
+        cls.neighbour = create_author('notes_1', 'Сосед')
+        cls.stranger = create_author('notes_2', 'Чужой')
+        cls.author_client = Client()
+        cls.author_client.force_login(cls.author)
+        cls.form_data = {'title': 'Заголовок', 'text': 'Текст', 'slug': 'slug'}
+
+    def test_create_edit_delete(self):
+        """Заметка создаётся, редактируется и удаляется в шарде автора."""
+        response = self.author_client.post(
+            reverse('notes:add'), data=self.form_data
+        )
+        self.assertRedirects(response, reverse('notes:success'))
+        self.assertEqual(Note.objects.using('notes_1').count(), 1)
+        self.assertEqual(Note.objects.using('notes_2').count(), 0)
+
+        self.form_data['title'] = 'Новый заголовок'
+        response = self.author_client.post(
+            reverse('notes:edit', args=('slug',)), data=self.form_data
+        )
+        self.assertRedirects(response, reverse('notes:success'))
+        note = Note.objects.for_author(self.author).get()
+        self.assertEqual(note.title, 'Новый заголовок')
+
+        response = self.author_client.post(
+            reverse('notes:delete', args=('slug',))
+        )
+        self.assertRedirects(response, reverse('notes:success'))
+        self.assertFalse(Note.objects.for_author(self.author).exists())
+
+    def test_slug_unique_per_shard(self):
+        """Slug уникален в пределах шарда, но не между шардами."""
+        Note.objects.create(slug='slug', text='Текст', author=self.stranger)
+        response = self.author_client.post(
+            reverse('notes:add'), data=self.form_data
+        )
+        self.assertRedirects(response, reverse('notes:success'))
+
+        Note.objects.filter(author=self.author).using('notes_1').delete()
+        Note.objects.create(slug='slug', text='Текст', author=self.neighbour)
+        response = self.author_client.post(
+            reverse('notes:add'), data=self.form_data
+        )
+        self.assertFormError(response, 'form', 'slug', 'slug' + WARNING)
+        self.assertFalse(Note.objects.for_author(self.author).exists())
+
+    def test_user_delete_removes_notes(self):
+        """Удаление пользователя удаляет его заметки из шарда."""
+        Note.objects.create(slug='slug', text='Текст', author=self.stranger)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.stranger.delete()
+        self.assertEqual(Note.objects.using('notes_2').count(), 0)
+
+    def test_rolled_back_user_delete_keeps_notes(self):
+        """Откат удаления пользователя не удаляет его заметки."""
+        Note.objects.create(slug='slug', text='Текст', author=self.stranger)
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            try:
+                with transaction.atomic():
+                    User.objects.get(pk=self.stranger.pk).delete()
+                    raise RuntimeError
+            except RuntimeError:
+                pass
+        self.assertEqual(callbacks, [])
+        self.assertEqual(Note.objects.using('notes_2').count(), 1)
+
+    def test_admin_disabled_with_several_shards(self):
+        """При нескольких шардах заметки в админке недоступны."""
+        admin = User.objects.create_superuser(username='Админ')
+        self.client.force_login(admin)
+        url = reverse('admin:notes_note_changelist')
+        self.assertEqual(
+            self.client.get(url).status_code, HTTPStatus.FORBIDDEN
+        )
+        with self.settings(NOTES_SHARDS=['default']):
+            self.assertEqual(self.client.get(url).status_code, HTTPStatus.OK)
+
+    def test_rebalance_moves_notes(self):
+        """Заметки переносятся в шард автора, в том числе после сбоя."""
+        for slug in ('first', 'second'):
+            Note.objects.using('notes_0').create(
+                slug=slug, text='Текст', author=self.author
+            )
+        # Прерванный ранее перенос успел скопировать одну заметку.
+        Note.objects.using('notes_1').create(
+            slug='first', text='Текст', author=self.author
+        )
+        out = StringIO()
+        call_command('rebalance_notes', stdout=out)
+        self.assertIn('Перенесено заметок: 2', out.getvalue())
+        self.assertEqual(Note.objects.using('notes_0').count(), 0)
+        self.assertQuerysetEqual(
+            Note.objects.for_author(self.author).order_by('slug'),
+            ['first', 'second'],
+            transform=lambda note: note.slug,
+        )
+
+    def test_rebalance_keeps_changed_note_with_same_slug(self):
+        """Новая заметка автора с тем же slug не считается копией."""
+        Note.objects.using('notes_0').create(
+            slug='slug', text='Старый текст', author=self.author
+        )
+        Note.objects.create(
+            slug='slug', text='Новый текст', author=self.author
+        )
+        with self.assertRaises(CommandError):
+            call_command('rebalance_notes', stdout=StringIO(),
+                         stderr=StringIO())
+        self.assertEqual(
+            Note.objects.using('notes_0').get().text, 'Старый текст'
+        )
+
+        call_command('rebalance_notes', '--rename-conflicts',
+                     stdout=StringIO())
+        self.assertFalse(Note.objects.using('notes_0').exists())
+        self.assertQuerysetEqual(
+            Note.objects.for_author(self.author).order_by('slug'),
+            [('slug', 'Новый текст'), ('slug-1', 'Старый текст')],
+            transform=lambda note: (note.slug, note.text),
+        )
+
+    def test_rebalance_slug_conflict(self):
+        """Конфликт slug прерывает перенос с ошибкой."""
+        Note.objects.using('notes_0').create(
+            slug='slug', text='Текст', author=self.author
+        )
+        Note.objects.create(slug='slug', text='Текст', author=self.neighbour)
+        with self.assertRaises(CommandError):
+            call_command('rebalance_notes', stdout=StringIO(),
+                         stderr=StringIO())
+        self.assertEqual(Note.objects.using('notes_0').count(), 1)
+
+        call_command('rebalance_notes', '--rename-conflicts',
+                     stdout=StringIO())
+        self.assertFalse(Note.objects.using('notes_0').exists())
+        self.assertEqual(
+            Note.objects.for_author(self.author).get().slug, 'slug-1'
+        )
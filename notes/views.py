@@ -23,7 +23,7 @@ class NoteBase(LoginRequiredMixin):
 
     def get_queryset(self):
         """Пользователь может работать только со своими заметками."""
-        return self.model.objects.filter(author=self.request.user)
+        return self.model.objects.for_author(self.request.user)
 
 
 class NoteCreate(NoteBase, generic.CreateView):
@@ -31,6 +31,12 @@ class NoteCreate(NoteBase, generic.CreateView):
     template_name = 'notes/form.html'
     form_class = NoteForm
 
+    def get_form_kwargs(self):
+        """Форме нужен автор, чтобы проверить slug в его шарде."""
+        kwargs = super().get_form_kwargs()
+        kwargs['instance'] = self.model(author=self.request.user)
+        return kwargs
+
     def form_valid(self, form):
         new_note = form.save(commit=False)
         new_note.author = self.request.user
@@ -1,3 +1,4 @@
+import os
 from pathlib import Path
 
 from django.urls import reverse_lazy
@@ -52,13 +53,39 @@ TEMPLATES = [
 WSGI_APPLICATION = 'yanote.wsgi.application'
 
 
+DB_DIR = Path(os.getenv('YANOTE_DB_DIR', BASE_DIR))
+
 DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
+        'NAME': DB_DIR / 'db.sqlite3',
     }
 }
 
+# Заметки раскладываются по шардам по хешу автора (см. notes.routers).
+# При одном шарде всё хранится в базе по умолчанию. После изменения
+# числа шардов нужно выполнить migrate для каждого нового шарда
+# (migrate --database notes_N) и затем rebalance_notes.
+NOTES_SHARD_COUNT = int(os.getenv('NOTES_SHARD_COUNT', 1))
+
+if NOTES_SHARD_COUNT > 1:
+    NOTES_SHARDS = [f'notes_{i}' for i in range(NOTES_SHARD_COUNT)]
+else:
+    NOTES_SHARDS = ['default']
+
+# Файлы выведенных из работы шардов тоже подключаются, чтобы
+# rebalance_notes мог забрать с них заметки.
+_shard_aliases = set(NOTES_SHARDS) | {
+    path.stem for path in DB_DIR.glob('notes_*.sqlite3')
+}
+for alias in sorted(_shard_aliases):
+    DATABASES.setdefault(alias, {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': DB_DIR / f'{alias}.sqlite3',
+    })
+
+DATABASE_ROUTERS = ['notes.routers.NoteShardRouter']
+
 
 AUTH_PASSWORD_VALIDATORS = [
     {
@@ -0,0 +1,12 @@
+from .settings import *  # noqa: F401,F403
+from .settings import DATABASES, DB_DIR
+
+# Шарды для тестов шардирования (notes/tests/test_sharding.py); сами
+# тесты включают их через override_settings(NOTES_SHARDS=...).
+TEST_NOTES_SHARDS = ['notes_0', 'notes_1', 'notes_2']
+
+for alias in TEST_NOTES_SHARDS:
+    DATABASES.setdefault(alias, {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': DB_DIR / f'{alias}.sqlite3',
+    })